@@ -1,6 +1,11 @@
-from flask import Flask, request, jsonify
+from flask import Flask, g, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import JSON
+from sqlalchemy import JSON, column, delete, event, table, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import load_only, raiseload, scoped_session, selectinload, sessionmaker
 from flask_cors import CORS, cross_origin
 from flask_jwt_extended import (
     JWTManager,
@@ -11,7 +16,21 @@ from flask_jwt_extended import (
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_migrate import Migrate
 import os
+import bisect
 import datetime
+import functools
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+from cachetools import TTLCache
+
+try:
+    import gevent
+    from gevent import monkey as gevent_monkey
+except ImportError:  # only needed by the production server (wsgi.py)
+    gevent = None
 
 import firebase_admin
 from firebase_admin import credentials, db as firebase_db
@@ -22,7 +41,28 @@ firebase_enabled = False
 # ────────────────────────────────────────────
 # Flask initialisation + CORS (allow Authorization)
 # ────────────────────────────────────────────
+# Keys stay sorted, matching Flask's default provider; non-string keys
+# (e.g. ids) are stringified as the stdlib encoder does
+ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    jsonify() backed by orjson. Dates and datetimes are encoded natively in
+    ISO 8601, and responses are built from the encoded bytes directly.
+    """
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Allow any origin to hit any /api/* endpoint **and** keep the
 # "Authorization" header so browsers can send `Bearer <jwt>`.
@@ -38,11 +78,75 @@ app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'dev-secret-key'
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = datetime.timedelta(days=1)
 jwt = JWTManager(app)
 
+# Werkzeug hashing method for new passwords, e.g. 'scrypt' (default) or
+# 'scrypt:16384:8:1' for a cheaper cost. Existing hashes keep verifying.
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+
 # Configure SQLite (or Postgres) database
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///evolvx.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# SQLite has a single writer, so the default (read/write) engine keeps one
+# connection and writes queue in the pool instead of retrying on SQLITE_BUSY.
+# Read-only endpoints use the 'ro' bind, which can fan out across connections.
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_size': 1, 'max_overflow': 0}
+app.config['SQLALCHEMY_BINDS'] = {
+    'ro': {
+        'url': 'sqlite:///file:evolvx.db?mode=ro&uri=true',
+        'pool_size': (os.cpu_count() or 1) * 2,
+    }
+}
 db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+def include_migration_object(obj, name, type_, reflected, compare_to):
+    """
+    Alembic autogenerate filter. The exercise search index (exercises_fts and
+    its shadow tables) is created by initialize_database, not db.metadata, so
+    it must not show up as tables to drop.
+    """
+    return not (type_ == 'table' and reflected and name.startswith('exercises_fts'))
+
+migrate = Migrate(app, db, include_object=include_migration_object)
+
+# SQLite tuning: NORMAL sync drops the fsync per commit. Applied to every
+# new pooled connection, including the read-only ones.
+SQLITE_PRAGMAS = (
+    'synchronous=NORMAL',
+    'busy_timeout=5000',
+    'temp_store=MEMORY',
+    'cache_size=-20000',
+    'foreign_keys=ON',
+)
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(f'PRAGMA {pragma}')
+    cursor.close()
+
+def set_sqlite_journal_mode(dbapi_connection, connection_record):
+    """
+    Switch the database to WAL, so readers run alongside the writer. The mode
+    is stored in the database file, so only the rw engine sets it: on a file
+    still in rollback-journal mode the 'ro' bind would fail with "attempt to
+    write a readonly database".
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.close()
+
+with app.app_context():
+    event.listen(db.engine, 'connect', set_sqlite_journal_mode)
+    
+    # Session for read-only endpoints, bound to the 'ro' engine
+    read_session = scoped_session(sessionmaker(bind=db.engines['ro'], query_cls=db.Query))
+
+@app.teardown_appcontext
+def remove_read_session(exc):
+    read_session.remove()
 
 # ——— Firebase init (will skip on error) ———
 import traceback
@@ -62,6 +166,13 @@ if firebase_enabled and os.path.isfile(FIREBASE_CRED) and FIREBASE_DB_URL:
 else:
     print("⚠️  Skipping Firebase init")
 
+# Best-effort work (Firebase writes, ranking refreshes) that must not hold up a response.
+# Under the gevent worker the pool threads are patched into greenlets.
+background_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='evolvx-bg')
+
+# Fans out the per-record Firebase reads a single response needs
+firebase_read_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='evolvx-firebase')
+
 # -------------------------------------------------
 # Database Models
 # -------------------------------------------------
@@ -76,8 +187,8 @@ class User(db.Model):
     gender = db.Column(db.String(20))
     height = db.Column(db.Float)
     weight = db.Column(db.Float)
-    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     
     workouts = db.relationship('Workout', backref='user', lazy=True)
     rankings = db.relationship('UserRanking', backref='user', lazy=True)
@@ -85,6 +196,10 @@ class User(db.Model):
 
 class Workout(db.Model):
     __tablename__ = 'workouts'
+    __table_args__ = (
+        db.Index('ix_workouts_user_created', 'user_id', 'created_at'),
+        db.Index('ix_workouts_user_date', 'user_id', 'workout_date'),
+    )
     
     workout_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
@@ -92,13 +207,17 @@ class Workout(db.Model):
     workout_date = db.Column(db.DateTime, nullable=False)
     duration = db.Column(db.Integer)  # in minutes
     notes = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     
     exercises = db.relationship('WorkoutExercise', backref='workout', lazy=True, cascade="all, delete-orphan")
 
 class Exercise(db.Model):
     __tablename__ = 'exercises'
+    __table_args__ = (
+        db.Index('ix_exercises_muscle_compound', 'muscle_group', 'is_compound'),
+        db.Index('ix_exercises_name', 'name', unique=True),
+    )
     
     exercise_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -115,45 +234,71 @@ class WorkoutExercise(db.Model):
     sets = db.Column(db.Integer, nullable=False)
     reps = db.Column(db.Integer, nullable=False)
     weight = db.Column(db.Float)
-    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     
     exercise = db.relationship('Exercise', backref='workout_exercises', lazy=True)
 
 class UserRanking(db.Model):
     __tablename__ = 'user_rankings'
+    __table_args__ = (
+        db.Index('ix_user_rankings_user_mg', 'user_id', 'muscle_group', unique=True),
+        db.Index('ix_user_rankings_mg_mmr', 'muscle_group', 'mmr_score'),
+    )
     
     ranking_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     muscle_group = db.Column(db.String(50), nullable=False)
     mmr_score = db.Column(db.Integer, nullable=False)
     rank_tier = db.Column(db.String(20), nullable=False)  # Bronze, Silver, Gold, etc.
-    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+class UserOverallMMR(db.Model):
+    """Average MMR across a user's muscle groups, maintained by update_user_rankings."""
+    __tablename__ = 'user_overall_mmr'
+    __table_args__ = (
+        db.Index('ix_user_overall_mmr_avg', 'avg_mmr'),
+    )
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), primary_key=True)
+    avg_mmr = db.Column(db.Float, nullable=False)
+    rank_tier = db.Column(db.String(20), nullable=False)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
 class SharedWorkout(db.Model):
     __tablename__ = 'shared_workouts'
+    __table_args__ = (
+        db.Index('ix_shared_workouts_active_created', 'is_active', 'created_at'),
+        db.Index('ix_shared_workouts_creator_active', 'creator_id', 'is_active', 'created_at'),
+    )
     
     shared_workout_id = db.Column(db.Integer, primary_key=True)
     creator_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     workout_name = db.Column(db.String(100), nullable=False)
     workout_date = db.Column(db.DateTime, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     
     participants = db.relationship('SharedWorkoutParticipant', backref='shared_workout', lazy=True, cascade="all, delete-orphan")
     creator = db.relationship('User', backref='created_workouts', lazy=True)
 
 class SharedWorkoutParticipant(db.Model):
     __tablename__ = 'shared_workout_participants'
+    __table_args__ = (
+        db.Index('ix_shared_workout_participants_workout_user', 'shared_workout_id', 'user_id'),
+    )
     
     participant_id = db.Column(db.Integer, primary_key=True)
     shared_workout_id = db.Column(db.Integer, db.ForeignKey('shared_workouts.shared_workout_id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
-    joined_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    joined_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     
     user = db.relationship('User', backref='shared_workout_participations', lazy=True)
 
 class UserAvatar(db.Model):
     __tablename__ = 'user_avatars'
+    __table_args__ = (
+        db.Index('ix_user_avatars_user', 'user_id', unique=True),
+    )
     
     avatar_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
@@ -163,21 +308,32 @@ class UserAvatar(db.Model):
     skin_tone = db.Column(db.String(50))
     outfit = db.Column(db.String(50))
     accessories = db.Column(JSON, default=list)
-    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
 class Friend(db.Model):
     __tablename__ = 'friends'
+    __table_args__ = (
+        db.Index('ix_friends_user_status', 'user_id', 'status'),
+        db.Index('ix_friends_friend_status', 'friend_id', 'status'),
+    )
     
     friendship_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     friend_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     status = db.Column(db.String(20), nullable=False)  # pending, accepted, rejected
-    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     
     user = db.relationship('User', foreign_keys=[user_id], backref='friend_requests_sent', lazy=True)
     friend = db.relationship('User', foreign_keys=[friend_id], backref='friend_requests_received', lazy=True)
 
+class SchemaMeta(db.Model):
+    """Single row recording the SCHEMA_VERSION initialize_database last completed."""
+    __tablename__ = 'schema_meta'
+    
+    meta_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+
 # API Routes
 
 # Authentication Routes
@@ -191,11 +347,14 @@ def register():
         if field not in data:
             return jsonify({'error': f'Missing required field: {field}'}), 400
     
-    # Check if user already exists
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already registered'}), 400
+    # Check if user already exists, an email clash is reported first
+    existing = read_session.query(User.email).filter(
+        db.or_(User.email == data['email'], User.username == data['username'])
+    ).order_by((User.email == data['email']).desc()).first()
     
-    if User.query.filter_by(username=data['username']).first():
+    if existing:
+        if existing.email == data['email']:
+            return jsonify({'error': 'Email already registered'}), 400
         return jsonify({'error': 'Username already taken'}), 400
     
     try:
@@ -206,19 +365,20 @@ def register():
         new_user = User(
             username=data['username'],
             email=data['email'],
-            password_hash=generate_password_hash(data['password']),
+            password_hash=hash_password(data['password']),
             date_of_birth=dob,
             gender=data.get('gender'),
             height=data.get('height'),
             weight=data.get('weight')
         )
         
+        begin_immediate()
         db.session.add(new_user)
         db.session.commit()
         
         # Initialize user in Firebase for real-time features
         if firebase_enabled:
-            firebase_db.child('users').child(str(new_user.user_id)).set({
+            background_executor.submit(set_firebase_user, new_user.user_id, {
                 'username': new_user.username,
                 'online_status': 'offline',
                 'last_active': datetime.datetime.utcnow().isoformat()
@@ -248,9 +408,9 @@ def login():
     
     try:
         # Find user by email
-        user = User.query.filter_by(email=data['email']).first()
+        user = read_session.query(User).filter_by(email=data['email']).first()
         
-        if not user or not check_password_hash(user.password_hash, data['password']):
+        if not user or not verify_password(user.password_hash, data['password']):
             return jsonify({'error': 'Invalid email or password'}), 401
         
         # Create access token
@@ -258,10 +418,7 @@ def login():
         
         # Update user status in Firebase
         if firebase_enabled:
-            firebase_db.child('users').child(str(user.user_id)).update({
-                'online_status': 'online',
-                'last_active': datetime.datetime.utcnow().isoformat()
-            })
+            background_executor.submit(update_firebase_presence, user.user_id, 'online')
         
         return jsonify({
             'message': 'Login successful',
@@ -279,7 +436,11 @@ def get_profile():
     current_user_id = get_jwt_identity()
     
     try:
-        user = User.query.get(current_user_id)
+        # Everything but the password hash
+        user = read_session.get(User, current_user_id, options=[load_only(
+            User.username, User.email, User.date_of_birth, User.gender,
+            User.height, User.weight, User.created_at
+        )])
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -288,11 +449,11 @@ def get_profile():
             'user_id': user.user_id,
             'username': user.username,
             'email': user.email,
-            'date_of_birth': user.date_of_birth.isoformat(),
+            'date_of_birth': user.date_of_birth,
             'gender': user.gender,
             'height': user.height,
             'weight': user.weight,
-            'created_at': user.created_at.isoformat()
+            'created_at': user.created_at
         }), 200
     
     except Exception as e:
@@ -305,7 +466,14 @@ def update_profile():
     data = request.get_json()
     
     try:
-        user = User.query.get(current_user_id)
+        # Hash a new password before touching the session, so the rw
+        # connection isn't held while it runs
+        password_hash = None
+        if 'password' in data and data['password']:
+            password_hash = hash_password(data['password'])
+        
+        begin_immediate()
+        user = db.session.get(User, current_user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -317,8 +485,8 @@ def update_profile():
                 setattr(user, field, data[field])
         
         # Special handling for password update
-        if 'password' in data and data['password']:
-            user.password_hash = generate_password_hash(data['password'])
+        if password_hash:
+            user.password_hash = password_hash
         
         db.session.commit()
         
@@ -336,48 +504,40 @@ def update_profile():
 @jwt_required()
 def get_workouts():
     user_id  = get_jwt_identity()
-    page     = request.args.get('page',     1,  type=int)
-    per_page = request.args.get('per_page', 10, type=int)
-
-    if page < 1 or per_page < 1:
-        return jsonify({ 'error': 'page and per_page must be positive integers' }), 422
+    page, per_page = paginate_args()
 
     paginated = (
-        Workout.query
+        read_session.query(Workout)
+        .options(
+            selectinload(Workout.exercises).selectinload(WorkoutExercise.exercise),
+            raiseload('*')
+        )
         .filter_by(user_id=user_id)
-        .order_by(Workout.created_at.desc())
+        .order_by(Workout.created_at.desc(), Workout.workout_id.desc())
         .paginate(page=page, per_page=per_page, error_out=False)
     )
 
-    # <-- your manual mapping here -->
-    result = []
-    for workout in paginated.items:
-        workout_data = {
+    # Encode one workout at a time instead of building the whole page
+    def serialize(workout):
+        return {
             'workout_id':   workout.workout_id,
             'workout_name': workout.workout_name,
-            'workout_date': workout.workout_date.isoformat(),
+            'workout_date': workout.workout_date,
             'duration':     workout.duration,
             'notes':        workout.notes,
-            'created_at':   workout.created_at.isoformat(),
-            'exercises':    []
-        }
-        for we in workout.exercises:
-            ex = we.exercise
-            workout_data['exercises'].append({
-                'exercise_id':   ex.exercise_id,
-                'name':          ex.name,
-                'muscle_group':  ex.muscle_group,
+            'created_at':   workout.created_at,
+            'exercises':    [{
+                'exercise_id':   we.exercise.exercise_id,
+                'name':          we.exercise.name,
+                'muscle_group':  we.exercise.muscle_group,
                 'sets':          we.sets,
                 'reps':          we.reps,
                 'weight':        we.weight,
-            })
-        result.append(workout_data)
+            } for we in workout.exercises]
+        }
 
-    return jsonify({
-        'workouts': result,
-        'total':    paginated.total,
-        'page':     page
-    })
+    return stream_json('workouts', paginated.items, serialize,
+                       {'total': paginated.total, 'page': page})
 
 
 @app.route('/api/workouts', methods=['POST'])
@@ -396,6 +556,14 @@ def create_workout():
         # Parse workout date
         workout_date = datetime.datetime.fromisoformat(data['workout_date'])
         
+        begin_immediate()
+        
+        # Validate exercises before writing anything
+        error = validate_workout_exercises(data['exercises'])
+        if error:
+            db.session.rollback()
+            return error
+        
         # Create new workout
         new_workout = Workout(
             user_id=current_user_id,
@@ -409,33 +577,12 @@ def create_workout():
         db.session.flush()  # Get workout_id without committing
         
         # Add exercises to workout
-        for exercise_data in data['exercises']:
-            # Validate required exercise fields
-            if 'exercise_id' not in exercise_data or 'sets' not in exercise_data or 'reps' not in exercise_data:
-                db.session.rollback()
-                return jsonify({'error': 'Each exercise must have exercise_id, sets, and reps'}), 400
-            
-            # Check if exercise exists
-            exercise = Exercise.query.get(exercise_data['exercise_id'])
-            if not exercise:
-                db.session.rollback()
-                return jsonify({'error': f'Exercise with ID {exercise_data["exercise_id"]} not found'}), 404
-            
-            # Create workout exercise
-            workout_exercise = WorkoutExercise(
-                workout_id=new_workout.workout_id,
-                exercise_id=exercise_data['exercise_id'],
-                sets=exercise_data['sets'],
-                reps=exercise_data['reps'],
-                weight=exercise_data.get('weight')
-            )
-            
-            db.session.add(workout_exercise)
+        insert_workout_exercises(new_workout.workout_id, data['exercises'])
         
         db.session.commit()
         
         # Update user rankings based on workout
-        update_user_rankings(current_user_id)
+        schedule_ranking_update(current_user_id)
         
         return jsonify({
             'message': 'Workout created successfully',
@@ -456,8 +603,11 @@ def get_workout(workout_id):
     current_user_id = get_jwt_identity()
     
     try:
-        # Get workout
-        workout = Workout.query.get(workout_id)
+        # Get workout together with its exercises
+        workout = read_session.get(Workout, workout_id, options=[
+            selectinload(Workout.exercises).selectinload(WorkoutExercise.exercise),
+            raiseload('*')
+        ])
         
         if not workout:
             return jsonify({'error': 'Workout not found'}), 404
@@ -470,10 +620,10 @@ def get_workout(workout_id):
         workout_data = {
             'workout_id': workout.workout_id,
             'workout_name': workout.workout_name,
-            'workout_date': workout.workout_date.isoformat(),
+            'workout_date': workout.workout_date,
             'duration': workout.duration,
             'notes': workout.notes,
-            'created_at': workout.created_at.isoformat(),
+            'created_at': workout.created_at,
             'exercises': []
         }
         
@@ -501,8 +651,10 @@ def update_workout(workout_id):
     data = request.get_json()
     
     try:
+        begin_immediate()
+        
         # Get workout
-        workout = Workout.query.get(workout_id)
+        workout = db.session.get(Workout, workout_id)
         
         if not workout:
             return jsonify({'error': 'Workout not found'}), 404
@@ -526,38 +678,23 @@ def update_workout(workout_id):
         
         # Update exercises if provided
         if 'exercises' in data:
-            # Remove existing exercises
-            for exercise in workout.exercises:
-                db.session.delete(exercise)
+            error = validate_workout_exercises(data['exercises'])
+            if error:
+                db.session.rollback()
+                return error
+            
+            # Replace existing exercises: one DELETE plus one multi-row INSERT
+            db.session.execute(
+                delete(WorkoutExercise).where(WorkoutExercise.workout_id == workout.workout_id)
+            )
             
             # Add new exercises
-            for exercise_data in data['exercises']:
-                # Validate required exercise fields
-                if 'exercise_id' not in exercise_data or 'sets' not in exercise_data or 'reps' not in exercise_data:
-                    db.session.rollback()
-                    return jsonify({'error': 'Each exercise must have exercise_id, sets, and reps'}), 400
-                
-                # Check if exercise exists
-                exercise = Exercise.query.get(exercise_data['exercise_id'])
-                if not exercise:
-                    db.session.rollback()
-                    return jsonify({'error': f'Exercise with ID {exercise_data["exercise_id"]} not found'}), 404
-                
-                # Create workout exercise
-                workout_exercise = WorkoutExercise(
-                    workout_id=workout.workout_id,
-                    exercise_id=exercise_data['exercise_id'],
-                    sets=exercise_data['sets'],
-                    reps=exercise_data['reps'],
-                    weight=exercise_data.get('weight')
-                )
-                
-                db.session.add(workout_exercise)
+            insert_workout_exercises(workout.workout_id, data['exercises'])
         
         db.session.commit()
         
         # Update user rankings based on workout
-        update_user_rankings(current_user_id)
+        schedule_ranking_update(current_user_id)
         
         return jsonify({
             'message': 'Workout updated successfully',
@@ -574,8 +711,10 @@ def delete_workout(workout_id):
     current_user_id = get_jwt_identity()
     
     try:
-        # Get workout
-        workout = Workout.query.get(workout_id)
+        begin_immediate()
+        
+        # Get workout, only the owner is needed for the check
+        workout = db.session.get(Workout, workout_id, options=[load_only(Workout.user_id)])
         
         if not workout:
             return jsonify({'error': 'Workout not found'}), 404
@@ -589,7 +728,7 @@ def delete_workout(workout_id):
         db.session.commit()
         
         # Update user rankings based on workout
-        update_user_rankings(current_user_id)
+        schedule_ranking_update(current_user_id)
         
         return jsonify({
             'message': 'Workout deleted successfully'
@@ -600,6 +739,12 @@ def delete_workout(workout_id):
         return jsonify({'error': str(e)}), 500
 
 # Exercise Routes
+# The exercise catalogue only changes when it is seeded, so encoded response
+# bodies are cached per process by filter. invalidate_exercise_cache drops them.
+EXERCISE_CACHE_TTL = 300  # seconds
+exercise_cache = TTLCache(maxsize=128, ttl=EXERCISE_CACHE_TTL)
+exercise_cache_lock = threading.Lock()
+
 @app.route('/api/exercises', methods=['GET'])
 @jwt_required()
 def get_exercises():
@@ -608,30 +753,45 @@ def get_exercises():
         muscle_group = request.args.get('muscle_group')
         search = request.args.get('search')
         
-        # Build query
-        query = Exercise.query
+        # Serve the already encoded body when this filter was seen recently
+        cache_key = (muscle_group, search)
+        with exercise_cache_lock:
+            cached = exercise_cache.get(cache_key)
+        if cached is not None:
+            return app.response_class(cached, mimetype=app.json.mimetype), 200
+        
+        # Build query over just the serialized columns
+        query = read_session.query(
+            Exercise.exercise_id,
+            Exercise.name,
+            Exercise.muscle_group,
+            Exercise.description,
+            Exercise.is_compound
+        )
         
         if muscle_group:
             query = query.filter_by(muscle_group=muscle_group)
         
         if search:
-            query = query.filter(Exercise.name.ilike(f'%{search}%'))
+            if exercise_fts_enabled() and len(search) >= 3:
+                # Trigram full-text index answers the substring match
+                matches = db.select(exercises_fts.c.rowid).where(
+                    text('exercises_fts MATCH :search').bindparams(search=fts_phrase(search))
+                )
+                query = query.filter(Exercise.exercise_id.in_(matches))
+            else:
+                query = query.filter(Exercise.name.ilike(f'%{search}%'))
         
         # Execute query
         exercises = query.order_by(Exercise.name).all()
         
-        result = []
-        for exercise in exercises:
-            exercise_data = {
-                'exercise_id': exercise.exercise_id,
-                'name': exercise.name,
-                'muscle_group': exercise.muscle_group,
-                'description': exercise.description,
-                'is_compound': exercise.is_compound
-            }
-            result.append(exercise_data)
+        result = [dict(row._mapping) for row in exercises]
         
-        return jsonify(result), 200
+        response = jsonify(result)
+        with exercise_cache_lock:
+            exercise_cache[cache_key] = response.get_data()
+        
+        return response, 200
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -644,12 +804,12 @@ def get_user_rankings(user_id):
     
     try:
         # Check if user exists
-        user = User.query.get(user_id)
+        user = read_session.get(User, user_id, options=[load_only(User.user_id)])
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Get user rankings
-        rankings = UserRanking.query.filter_by(user_id=user_id).all()
+        rankings = read_session.query(UserRanking).filter_by(user_id=user_id).order_by(UserRanking.ranking_id).all()
         
         result = []
         for ranking in rankings:
@@ -657,7 +817,7 @@ def get_user_rankings(user_id):
                 'muscle_group': ranking.muscle_group,
                 'mmr_score': ranking.mmr_score,
                 'rank_tier': ranking.rank_tier,
-                'updated_at': ranking.updated_at.isoformat()
+                'updated_at': ranking.updated_at
             }
             result.append(ranking_data)
         
@@ -666,6 +826,14 @@ def get_user_rankings(user_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Leaderboard pages are the same for every user and only change when rankings
+# do, so payloads are cached per process for a short TTL. update_user_rankings
+# bumps the generation so this process stops serving pages it has made stale.
+LEADERBOARD_CACHE_TTL = 30  # seconds
+leaderboard_cache = TTLCache(maxsize=512, ttl=LEADERBOARD_CACHE_TTL)
+leaderboard_cache_lock = threading.Lock()
+leaderboard_generation = 0
+
 @app.route('/api/rankings/leaderboard', methods=['GET'])
 @jwt_required()
 def get_leaderboard():
@@ -674,29 +842,39 @@ def get_leaderboard():
         muscle_group = request.args.get('muscle_group', 'overall')
         min_age = request.args.get('min_age', type=int)
         max_age = request.args.get('max_age', type=int)
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        page, per_page = paginate_args()
+        
+        # Serve from cache when this page was built recently
+        cache_key = (leaderboard_generation, muscle_group, min_age, max_age, page, per_page)
+        with leaderboard_cache_lock:
+            cached = leaderboard_cache.get(cache_key)
+        if cached is not None:
+            return jsonify(cached), 200
+        
+        today = datetime.date.today()
+        
+        # Age and rank tier are computed in SQL, so rows come back ready to serialize
+        age = age_expression(User.date_of_birth, today).label('age')
         
         # Build base query
         if muscle_group == 'overall':
-            # For overall ranking, we need to calculate the average MMR across all muscle groups
-            # This is a simplified approach - in a real app, you might use a more complex algorithm
-            subquery = db.session.query(
-                UserRanking.user_id,
-                db.func.avg(UserRanking.mmr_score).label('avg_mmr')
-            ).group_by(UserRanking.user_id).subquery()
-            
-            query = db.session.query(
-                User,
-                subquery.c.avg_mmr
+            # For overall ranking, read the precomputed average MMR across all muscle groups
+            query = read_session.query(
+                User.user_id,
+                User.username,
+                age,
+                db.cast(UserOverallMMR.avg_mmr, db.Integer).label('mmr_score'),
+                UserOverallMMR.rank_tier
             ).join(
-                subquery,
-                User.user_id == subquery.c.user_id
+                UserOverallMMR,
+                User.user_id == UserOverallMMR.user_id
             )
         else:
             # For specific muscle group, get the ranking for that muscle group
-            query = db.session.query(
-                User,
+            query = read_session.query(
+                User.user_id,
+                User.username,
+                age,
                 UserRanking.mmr_score,
                 UserRanking.rank_tier
             ).join(
@@ -709,7 +887,6 @@ def get_leaderboard():
         
         # Apply age filter if provided
         if min_age is not None or max_age is not None:
-            today = datetime.date.today()
             if min_age is not None:
                 min_date = today.replace(year=today.year - min_age)
                 query = query.filter(User.date_of_birth <= min_date)
@@ -719,50 +896,27 @@ def get_leaderboard():
         
         # Order by MMR score
         if muscle_group == 'overall':
-            query = query.order_by(subquery.c.avg_mmr.desc())
+            query = query.order_by(UserOverallMMR.avg_mmr.desc())
         else:
             query = query.order_by(UserRanking.mmr_score.desc())
         
         # Paginate results
         paginated_results = query.paginate(page=page, per_page=per_page, error_out=False)
         
-        result = []
-        for item in paginated_results.items:
-            user = item[0]
-            
-            # Calculate age
-            today = datetime.date.today()
-            age = today.year - user.date_of_birth.year - ((today.month, today.day) < (user.date_of_birth.month, user.date_of_birth.day))
-            
-            user_data = {
-                'user_id': user.user_id,
-                'username': user.username,
-                'age': age
-            }
-            
-            if muscle_group == 'overall':
-                user_data['mmr_score'] = int(item[1])  # Convert Decimal to int
-                
-                # Determine rank tier based on MMR score
-                if user_data['mmr_score'] >= 1000:
-                    user_data['rank_tier'] = 'Gold'
-                elif user_data['mmr_score'] >= 500:
-                    user_data['rank_tier'] = 'Silver'
-                else:
-                    user_data['rank_tier'] = 'Bronze'
-            else:
-                user_data['mmr_score'] = item[1]
-                user_data['rank_tier'] = item[2]
-            
-            result.append(user_data)
+        result = [dict(row._mapping) for row in paginated_results.items]
         
-        return jsonify({
+        leaderboard_data = {
             'leaderboard': result,
             'total': paginated_results.total,
             'pages': paginated_results.pages,
             'current_page': page,
             'muscle_group': muscle_group
-        }), 200
+        }
+        
+        with leaderboard_cache_lock:
+            leaderboard_cache[cache_key] = leaderboard_data
+        
+        return jsonify(leaderboard_data), 200
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -776,43 +930,31 @@ def get_friends_leaderboard():
         # Get query parameters
         muscle_group = request.args.get('muscle_group', 'overall')
         
-        # Get user's friends
-        friends_query = Friend.query.filter(
-            db.or_(
-                db.and_(Friend.user_id == current_user_id, Friend.status == 'accepted'),
-                db.and_(Friend.friend_id == current_user_id, Friend.status == 'accepted')
-            )
-        )
+        # Get user's friends and add the current user to the list
+        friend_ids = accepted_friend_ids(current_user_id) + [current_user_id]
         
-        friend_ids = []
-        for friendship in friends_query.all():
-            if friendship.user_id == current_user_id:
-                friend_ids.append(friendship.friend_id)
-            else:
-                friend_ids.append(friendship.user_id)
-        
-        # Add current user to the list
-        friend_ids.append(current_user_id)
+        # Age is computed in SQL, as in get_leaderboard
+        age = age_expression(User.date_of_birth, datetime.date.today()).label('age')
         
         # Build base query
         if muscle_group == 'overall':
-            # For overall ranking, calculate the average MMR across all muscle groups
-            subquery = db.session.query(
-                UserRanking.user_id,
-                db.func.avg(UserRanking.mmr_score).label('avg_mmr')
-            ).filter(UserRanking.user_id.in_(friend_ids)).group_by(UserRanking.user_id).subquery()
-            
-            query = db.session.query(
-                User,
-                subquery.c.avg_mmr
+            # For overall ranking, read the precomputed average MMR across all muscle groups
+            query = read_session.query(
+                User.user_id,
+                User.username,
+                age,
+                db.cast(UserOverallMMR.avg_mmr, db.Integer).label('mmr_score'),
+                UserOverallMMR.rank_tier
             ).join(
-                subquery,
-                User.user_id == subquery.c.user_id
-            )
+                UserOverallMMR,
+                User.user_id == UserOverallMMR.user_id
+            ).filter(User.user_id.in_(friend_ids))
         else:
             # For specific muscle group, get the ranking for that muscle group
-            query = db.session.query(
-                User,
+            query = read_session.query(
+                User.user_id,
+                User.username,
+                age,
                 UserRanking.mmr_score,
                 UserRanking.rank_tier
             ).join(
@@ -825,43 +967,17 @@ def get_friends_leaderboard():
         
         # Order by MMR score
         if muscle_group == 'overall':
-            query = query.order_by(subquery.c.avg_mmr.desc())
+            query = query.order_by(UserOverallMMR.avg_mmr.desc())
         else:
             query = query.order_by(UserRanking.mmr_score.desc())
         
         # Execute query
         results = query.all()
         
-        result = []
-        for item in results:
-            user = item[0]
-            
-            # Calculate age
-            today = datetime.date.today()
-            age = today.year - user.date_of_birth.year - ((today.month, today.day) < (user.date_of_birth.month, user.date_of_birth.day))
-            
-            user_data = {
-                'user_id': user.user_id,
-                'username': user.username,
-                'age': age,
-                'is_current_user': user.user_id == current_user_id
-            }
-            
-            if muscle_group == 'overall':
-                user_data['mmr_score'] = int(item[1])  # Convert Decimal to int
-                
-                # Determine rank tier based on MMR score
-                if user_data['mmr_score'] >= 1000:
-                    user_data['rank_tier'] = 'Gold'
-                elif user_data['mmr_score'] >= 500:
-                    user_data['rank_tier'] = 'Silver'
-                else:
-                    user_data['rank_tier'] = 'Bronze'
-            else:
-                user_data['mmr_score'] = item[1]
-                user_data['rank_tier'] = item[2]
-            
-            result.append(user_data)
+        result = [
+            dict(row._mapping, is_current_user=row.user_id == current_user_id)
+            for row in results
+        ]
         
         return jsonify({
             'leaderboard': result,
@@ -879,7 +995,7 @@ def get_recommendations():
     
     try:
         # Get user rankings
-        rankings = UserRanking.query.filter_by(user_id=current_user_id).all()
+        rankings = read_session.query(UserRanking).filter_by(user_id=current_user_id).all()
         
         if not rankings:
             return jsonify({'message': 'No workout data available for recommendations'}), 200
@@ -891,17 +1007,7 @@ def get_recommendations():
         recommendations = []
         for ranking in lowest_ranked:
             # Get exercises for this muscle group
-            exercises = Exercise.query.filter_by(muscle_group=ranking.muscle_group).limit(3).all()
-            
-            exercise_list = []
-            for exercise in exercises:
-                exercise_data = {
-                    'exercise_id': exercise.exercise_id,
-                    'name': exercise.name,
-                    'description': exercise.description,
-                    'is_compound': exercise.is_compound
-                }
-                exercise_list.append(exercise_data)
+            exercise_list = list(recommended_exercises(ranking.muscle_group))
             
             recommendation = {
                 'muscle_group': ranking.muscle_group,
@@ -940,40 +1046,47 @@ def get_progress():
         else:
             return jsonify({'error': 'Invalid period. Use week, month, or year.'}), 400
         
-        # Get workouts in the period
-        workouts = Workout.query.filter(
+        in_period = db.and_(
             Workout.user_id == current_user_id,
             Workout.workout_date >= start_date
-        ).order_by(Workout.workout_date).all()
+        )
         
-        if not workouts:
-            return jsonify({'message': 'No workout data available for the selected period'}), 200
+        # Count workouts in the period
+        total_workouts = read_session.query(db.func.count(Workout.workout_id)).filter(in_period).scalar()
         
-        # Calculate progress metrics
-        total_workouts = len(workouts)
-        total_volume = 0
-        muscle_group_volume = {}
-        
-        for workout in workouts:
-            for workout_exercise in workout.exercises:
-                exercise = workout_exercise.exercise
-                volume = workout_exercise.sets * workout_exercise.reps * (workout_exercise.weight or 0)
-                total_volume += volume
-                
-                if exercise.muscle_group not in muscle_group_volume:
-                    muscle_group_volume[exercise.muscle_group] = 0
-                
-                muscle_group_volume[exercise.muscle_group] += volume
+        if not total_workouts:
+            return jsonify({'message': 'No workout data available for the selected period'}), 200
         
-        # Get user rankings
-        rankings = UserRanking.query.filter_by(user_id=current_user_id).all()
-        ranking_data = {}
+        # Volume (sets * reps * weight) per muscle group in the period, with
+        # the user's ranking for that muscle group, largest volume first
+        volume = db.func.sum(
+            WorkoutExercise.sets * WorkoutExercise.reps * db.func.coalesce(WorkoutExercise.weight, 0)
+        )
+        muscle_group_rows = read_session.query(
+            Exercise.muscle_group,
+            volume,
+            UserRanking.rank_tier,
+            UserRanking.mmr_score
+        ).select_from(WorkoutExercise).join(
+            Workout, Workout.workout_id == WorkoutExercise.workout_id
+        ).join(
+            Exercise, Exercise.exercise_id == WorkoutExercise.exercise_id
+        ).outerjoin(
+            UserRanking,
+            db.and_(
+                UserRanking.user_id == current_user_id,
+                UserRanking.muscle_group == Exercise.muscle_group
+            )
+        ).filter(in_period).group_by(
+            Exercise.muscle_group,
+            UserRanking.ranking_id
+        ).order_by(
+            volume.desc(),
+            db.func.min(Workout.workout_date),
+            db.func.min(WorkoutExercise.workout_exercise_id)
+        ).all()
         
-        for ranking in rankings:
-            ranking_data[ranking.muscle_group] = {
-                'rank_tier': ranking.rank_tier,
-                'mmr_score': ranking.mmr_score
-            }
+        total_volume = sum(row[1] for row in muscle_group_rows)
         
         # Prepare progress data
         progress_data = {
@@ -983,26 +1096,19 @@ def get_progress():
             'muscle_groups': []
         }
         
-        for muscle_group, volume in muscle_group_volume.items():
+        for muscle_group, volume, rank_tier, mmr_score in muscle_group_rows:
             muscle_group_data = {
                 'muscle_group': muscle_group,
                 'volume': volume,
                 'percentage': (volume / total_volume * 100) if total_volume > 0 else 0
             }
             
-            if muscle_group in ranking_data:
-                muscle_group_data['rank_tier'] = ranking_data[muscle_group]['rank_tier']
-                muscle_group_data['mmr_score'] = ranking_data[muscle_group]['mmr_score']
+            if rank_tier is not None:
+                muscle_group_data['rank_tier'] = rank_tier
+                muscle_group_data['mmr_score'] = mmr_score
             
             progress_data['muscle_groups'].append(muscle_group_data)
         
-        # Sort muscle groups by volume
-        progress_data['muscle_groups'] = sorted(
-            progress_data['muscle_groups'],
-            key=lambda x: x['volume'],
-            reverse=True
-        )
-        
         return jsonify(progress_data), 200
     
     except Exception as e:
@@ -1018,23 +1124,34 @@ def get_friends():
         # Get status filter from query parameters
         status = request.args.get('status', 'accepted')  # accepted, pending, all
         
+        # Each friendship row is joined to the user on the other side, with
+        # that user's workout count, so the list is built from one query
+        workout_count = db.select(db.func.count(Workout.workout_id)).where(
+            Workout.user_id == User.user_id
+        ).correlate(User).scalar_subquery()
+        query = read_session.query(
+            Friend,
+            User,
+            workout_count
+        ).join(User, User.user_id == friend_peer_id(current_user_id))
+        
         # Build query based on status
         if status == 'all':
-            query = Friend.query.filter(
+            query = query.filter(
                 db.or_(
                     Friend.user_id == current_user_id,
                     Friend.friend_id == current_user_id
                 )
             )
         elif status == 'pending':
-            query = Friend.query.filter(
+            query = query.filter(
                 db.or_(
                     db.and_(Friend.user_id == current_user_id, Friend.status == 'pending'),
                     db.and_(Friend.friend_id == current_user_id, Friend.status == 'pending')
                 )
             )
         else:  # accepted
-            query = Friend.query.filter(
+            query = query.filter(
                 db.or_(
                     db.and_(Friend.user_id == current_user_id, Friend.status == 'accepted'),
                     db.and_(Friend.friend_id == current_user_id, Friend.status == 'accepted')
@@ -1042,33 +1159,24 @@ def get_friends():
             )
         
         # Execute query
-        friendships = query.all()
+        friendships = query.order_by(Friend.friendship_id).all()
+        
+        # Get friends' online status from Firebase
+        firebase_users = {}
+        if firebase_enabled:
+            firebase_users = batch_firebase_get('users', [friend.user_id for _, friend, _ in friendships])
         
         result = []
-        for friendship in friendships:
-            # Determine which user is the friend
-            if friendship.user_id == current_user_id:
-                friend = User.query.get(friendship.friend_id)
-                is_outgoing = True
-            else:
-                friend = User.query.get(friendship.user_id)
-                is_outgoing = False
+        for friendship, friend, workout_count in friendships:
+            is_outgoing = friendship.user_id == current_user_id
             
-            # Get friend's workout count
-            workout_count = Workout.query.filter_by(user_id=friend.user_id).count()
-            
-            # Get friend's online status from Firebase
             online_status = 'unknown'
             last_active = None
             
-            if firebase_enabled:
-                try:
-                    friend_data = firebase_db.child('users').child(str(friend.user_id)).get()
-                    if friend_data:
-                        online_status = friend_data.get('online_status', 'offline')
-                        last_active = friend_data.get('last_active')
-                except Exception as e:
-                    print(f"Firebase error: {e}")
+            friend_data = firebase_users.get(friend.user_id)
+            if friend_data:
+                online_status = friend_data.get('online_status', 'offline')
+                last_active = friend_data.get('last_active')
             
             friend_data = {
                 'friendship_id': friendship.friendship_id,
@@ -1076,7 +1184,7 @@ def get_friends():
                 'username': friend.username,
                 'status': friendship.status,
                 'is_outgoing': is_outgoing,
-                'created_at': friendship.created_at.isoformat(),
+                'created_at': friendship.created_at,
                 'workout_count': workout_count,
                 'online_status': online_status,
                 'last_active': last_active
@@ -1199,64 +1307,58 @@ def get_shared_workouts():
         # This includes workouts created by friends and workouts the user is participating in
         
         # Get user's friends
-        friends_query = Friend.query.filter(
+        friend_ids = accepted_friend_ids(current_user_id)
+        
+        # Participant count and the user's participation come back with each workout
+        participant_count = db.select(db.func.count(SharedWorkoutParticipant.participant_id)).where(
+            SharedWorkoutParticipant.shared_workout_id == SharedWorkout.shared_workout_id
+        ).correlate(SharedWorkout).scalar_subquery()
+        is_participating = SharedWorkout.participants.any(SharedWorkoutParticipant.user_id == current_user_id)
+        
+        # Get shared workouts created by friends or the user, or that the
+        # user is participating in, newest first
+        rows = read_session.query(
+            SharedWorkout,
+            participant_count,
+            is_participating
+        ).filter(
+            SharedWorkout.is_active == True,
             db.or_(
-                db.and_(Friend.user_id == current_user_id, Friend.status == 'accepted'),
-                db.and_(Friend.friend_id == current_user_id, Friend.status == 'accepted')
+                SharedWorkout.creator_id.in_(friend_ids + [current_user_id]),
+                is_participating
             )
-        )
-        
-        friend_ids = []
-        for friendship in friends_query.all():
-            if friendship.user_id == current_user_id:
-                friend_ids.append(friendship.friend_id)
-            else:
-                friend_ids.append(friendship.user_id)
-        
-        # Get shared workouts created by friends or the user
-        creator_workouts = SharedWorkout.query.filter(
-            SharedWorkout.creator_id.in_(friend_ids + [current_user_id]),
-            SharedWorkout.is_active == True
-        ).all()
+        ).order_by(SharedWorkout.created_at.desc(), SharedWorkout.shared_workout_id.desc()).all()
+        all_workouts = [workout for workout, _, _ in rows]
         
-        # Get shared workouts the user is participating in
-        participant_workouts_query = db.session.query(SharedWorkout).join(
-            SharedWorkoutParticipant,
-            db.and_(
-                SharedWorkout.shared_workout_id == SharedWorkoutParticipant.shared_workout_id,
-                SharedWorkoutParticipant.user_id == current_user_id
+        # Get real-time data from Firebase
+        firebase_workouts = {}
+        if firebase_enabled:
+            firebase_workouts = batch_firebase_get(
+                'shared_workouts', [workout.shared_workout_id for workout in all_workouts]
             )
-        ).filter(SharedWorkout.is_active == True)
         
-        participant_workouts = participant_workouts_query.all()
-        
-        # Combine and deduplicate workouts
-        all_workouts = list(set(creator_workouts + participant_workouts))
+        # Look up creator and live participant names for all workouts at once
+        user_ids = {workout.creator_id for workout in all_workouts}
+        for firebase_workout in firebase_workouts.values():
+            if 'participants' in firebase_workout:
+                user_ids.update(int(user_id) for user_id in firebase_workout['participants'] if user_id.isdigit())
+        usernames = dict(
+            read_session.query(User.user_id, User.username).filter(User.user_id.in_(user_ids)).all()
+        )
         
         result = []
-        for workout in all_workouts:
-            # Get creator
-            creator = User.query.get(workout.creator_id)
-            
-            # Get participants
-            participants = SharedWorkoutParticipant.query.filter_by(shared_workout_id=workout.shared_workout_id).all()
-            participant_count = len(participants)
-            
-            # Check if current user is participating
-            is_participating = any(p.user_id == current_user_id for p in participants)
-            
-            # Get real-time data from Firebase
+        for workout, participant_count, is_participating in rows:
             participant_data = []
-            if firebase_enabled:
+            firebase_workout = firebase_workouts.get(workout.shared_workout_id)
+            if firebase_workout:
                 try:
-                    firebase_workout = firebase_db.child('shared_workouts').child(str(workout.shared_workout_id)).get()
-                    if firebase_workout and 'participants' in firebase_workout:
+                    if 'participants' in firebase_workout:
                         for user_id, data in firebase_workout['participants'].items():
-                            user = User.query.get(int(user_id))
-                            if user:
+                            username = usernames.get(int(user_id))
+                            if username:
                                 participant_data.append({
-                                    'user_id': user.user_id,
-                                    'username': user.username,
+                                    'user_id': int(user_id),
+                                    'username': username,
                                     'joined_at': data.get('joined_at'),
                                     'exercises_completed': data.get('exercises_completed', 0)
                                 })
@@ -1267,21 +1369,18 @@ def get_shared_workouts():
                 'shared_workout_id': workout.shared_workout_id,
                 'workout_name': workout.workout_name,
                 'creator_id': workout.creator_id,
-                'creator_name': creator.username if creator else 'Unknown',
-                'workout_date': workout.workout_date.isoformat(),
+                'creator_name': usernames.get(workout.creator_id, 'Unknown'),
+                'workout_date': workout.workout_date,
                 'is_active': workout.is_active,
-                'created_at': workout.created_at.isoformat(),
+                'created_at': workout.created_at,
                 'participant_count': participant_count,
-                'is_participating': is_participating,
+                'is_participating': bool(is_participating),
                 'is_creator': workout.creator_id == current_user_id,
                 'participants': participant_data
             }
             
             result.append(workout_data)
         
-        # Sort by creation date, newest first
-        result = sorted(result, key=lambda x: x['created_at'], reverse=True)
-        
         return jsonify(result), 200
     
     except Exception as e:
@@ -1399,7 +1498,7 @@ def join_shared_workout(shared_workout_id):
 def get_avatar(user_id):
     try:
         # Get avatar
-        avatar = UserAvatar.query.filter_by(user_id=user_id).first()
+        avatar = read_session.query(UserAvatar).filter_by(user_id=user_id).first()
         
         if not avatar:
             return jsonify({'message': 'No avatar found for this user'}), 404
@@ -1413,7 +1512,7 @@ def get_avatar(user_id):
             'skin_tone': avatar.skin_tone,
             'outfit': avatar.outfit,
             'accessories': avatar.accessories,
-            'updated_at': avatar.updated_at.isoformat()
+            'updated_at': avatar.updated_at
         }
         
         return jsonify(avatar_data), 200
@@ -1433,33 +1532,34 @@ def update_avatar(user_id):
     data = request.get_json()
     
     try:
-        # Check if user has an avatar
-        avatar = UserAvatar.query.filter_by(user_id=user_id).first()
-        
-        if avatar:
-            # Update existing avatar
-            updateable_fields = ['body_type', 'hair_style', 'hair_color', 'skin_tone', 'outfit', 'accessories']
-            for field in updateable_fields:
-                if field in data:
-                    setattr(avatar, field, data[field])
-        else:
-            # Create new avatar
-            avatar = UserAvatar(
-                user_id=user_id,
-                body_type=data.get('body_type'),
-                hair_style=data.get('hair_style'),
-                hair_color=data.get('hair_color'),
-                skin_tone=data.get('skin_tone'),
-                outfit=data.get('outfit'),
-                accessories=data.get('accessories', [])
-            )
-            db.session.add(avatar)
+        # Create the avatar, or update only the provided fields of an existing one
+        avatar_upsert = upsert_statement(UserAvatar).values(
+            user_id=user_id,
+            body_type=data.get('body_type'),
+            hair_style=data.get('hair_style'),
+            hair_color=data.get('hair_color'),
+            skin_tone=data.get('skin_tone'),
+            outfit=data.get('outfit'),
+            accessories=data.get('accessories', [])
+        )
+        
+        updateable_fields = ['body_type', 'hair_style', 'hair_color', 'skin_tone', 'outfit', 'accessories']
+        updates = {
+            field: avatar_upsert.excluded[field]
+            for field in updateable_fields if field in data
+        }
+        updates['updated_at'] = avatar_upsert.excluded.updated_at
+        
+        avatar_id = db.session.execute(avatar_upsert.on_conflict_do_update(
+            index_elements=['user_id'],
+            set_=updates
+        ).returning(UserAvatar.avatar_id)).scalar_one()
         
         db.session.commit()
         
         return jsonify({
             'message': 'Avatar updated successfully',
-            'avatar_id': avatar.avatar_id
+            'avatar_id': avatar_id
         }), 200
     
     except Exception as e:
@@ -1467,165 +1567,475 @@ def update_avatar(user_id):
         return jsonify({'error': str(e)}), 500
 
 # Helper Functions
+def run_cpu_bound(func, *args):
+    """
+    Run a CPU-heavy call without stalling other requests.
+    Under gevent workers the call goes to the hub's native thread pool so the
+    event loop keeps serving greenlets; otherwise it runs inline.
+    """
+    if gevent is not None and gevent_monkey.is_module_patched('socket'):
+        return gevent.get_hub().threadpool.apply(func, args)
+    return func(*args)
+
+def hash_password(password):
+    return run_cpu_bound(generate_password_hash, password, app.config['PASSWORD_HASH_METHOD'])
+
+def verify_password(password_hash, password):
+    return run_cpu_bound(check_password_hash, password_hash, password)
+
+def set_firebase_user(user_id, user_data):
+    """Create the user's Firebase record. Runs on the background executor."""
+    try:
+        firebase_db.child('users').child(str(user_id)).set(user_data)
+    except Exception as e:
+        print(f"Firebase error: {e}")
+
+def update_firebase_presence(user_id, online_status):
+    """Best-effort presence update. Runs on the background executor."""
+    try:
+        firebase_db.child('users').child(str(user_id)).update({
+            'online_status': online_status,
+            'last_active': datetime.datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        print(f"Firebase error: {e}")
+
+def batch_firebase_get(path, ids):
+    """
+    Read firebase_db/<path>/<id> for each id concurrently and return
+    {id: data}. Records that are missing or fail to load are left out.
+    """
+    def fetch(record_id):
+        try:
+            return firebase_db.child(path).child(str(record_id)).get()
+        except Exception as e:
+            print(f"Firebase error: {e}")
+            return None
+
+    ids = list(dict.fromkeys(ids))
+    results = zip(ids, firebase_read_executor.map(fetch, ids))
+    return {record_id: data for record_id, data in results if data}
+
+def begin_immediate():
+    """
+    Open the session's transaction with BEGIN IMMEDIATE on SQLite, so the
+    write lock is taken up front and the reads that follow see the data the
+    writes will commit against. Does nothing on other databases or once a
+    transaction is already open; commit/rollback end it as usual.
+    """
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite' and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+def upsert_statement(model):
+    """INSERT supporting ON CONFLICT clauses for the configured database."""
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+MAX_PER_PAGE = 100
+
+def paginate_args(default_per_page=10):
+    """Read page and per_page from the query string, clamping page to 1+ and per_page to 1..MAX_PER_PAGE."""
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(MAX_PER_PAGE, max(1, request.args.get('per_page', default_per_page, type=int)))
+    return page, per_page
+
+def stream_json(key, rows, serialize, extra):
+    """
+    Stream {key: [serialize(row), ...], **extra} as a JSON response,
+    encoding one row at a time so the full payload is never held in memory.
+    """
+    def generate():
+        yield b'{' + orjson.dumps(key) + b':['
+        for i, row in enumerate(rows):
+            if i:
+                yield b','
+            yield orjson.dumps(serialize(row), default=app.json.default, option=ORJSON_OPTIONS)
+        yield b']'
+        for name, value in extra.items():
+            yield b',' + orjson.dumps(name) + b':' + orjson.dumps(value, default=app.json.default, option=ORJSON_OPTIONS)
+        yield b'}\n'
+
+    return app.response_class(stream_with_context(generate()), mimetype=app.json.mimetype)
+
+def invalidate_leaderboard_cache():
+    """Drop cached leaderboard pages after rankings change."""
+    global leaderboard_generation
+    with leaderboard_cache_lock:
+        leaderboard_generation += 1
+        leaderboard_cache.clear()
+
+@functools.lru_cache(maxsize=64)
+def recommended_exercises(muscle_group):
+    """The first three catalogue exercises for a muscle group, cached until the catalogue changes."""
+    exercises = read_session.query(
+        Exercise.exercise_id,
+        Exercise.name,
+        Exercise.description,
+        Exercise.is_compound
+    ).filter_by(muscle_group=muscle_group).order_by(Exercise.exercise_id).limit(3).all()
+    return tuple(dict(row._mapping) for row in exercises)
+
+@functools.lru_cache(maxsize=1)
+def known_exercise_ids():
+    """Every catalogue exercise id, loaded once per process for validating workout payloads."""
+    return frozenset(row.exercise_id for row in read_session.query(Exercise.exercise_id))
+
+def invalidate_exercise_cache():
+    """Drop cached exercise lists after the catalogue changes."""
+    with exercise_cache_lock:
+        exercise_cache.clear()
+    recommended_exercises.cache_clear()
+    known_exercise_ids.cache_clear()
+
+# SQLite full-text index over exercise names. The trigram tokenizer matches
+# any substring of 3+ characters case-insensitively, like the ILIKE it replaces.
+exercises_fts = table('exercises_fts', column('rowid'))
+
+def exercise_fts_enabled():
+    """True when the database is SQLite with trigram tokenizer support (3.34+)."""
+    return db.engine.dialect.name == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0)
+
+EXERCISE_FTS_DDL = (
+    """CREATE VIRTUAL TABLE exercises_fts USING fts5(
+        name, content='exercises', content_rowid='exercise_id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER exercises_fts_insert AFTER INSERT ON exercises BEGIN
+        INSERT INTO exercises_fts(rowid, name) VALUES (new.exercise_id, new.name);
+    END""",
+    """CREATE TRIGGER exercises_fts_delete AFTER DELETE ON exercises BEGIN
+        INSERT INTO exercises_fts(exercises_fts, rowid, name) VALUES ('delete', old.exercise_id, old.name);
+    END""",
+    """CREATE TRIGGER exercises_fts_update AFTER UPDATE OF name ON exercises BEGIN
+        INSERT INTO exercises_fts(exercises_fts, rowid, name) VALUES ('delete', old.exercise_id, old.name);
+        INSERT INTO exercises_fts(rowid, name) VALUES (new.exercise_id, new.name);
+    END""",
+    "INSERT INTO exercises_fts(exercises_fts) VALUES ('rebuild')",
+)
+
+def fts_phrase(search):
+    """Quote user input as a single FTS5 phrase so operators in it are matched literally."""
+    return '"' + search.replace('"', '""') + '"'
+
+def friend_peer_id(user_id):
+    """SQL expression for the other user in a Friend row that involves `user_id`."""
+    return db.case((Friend.user_id == user_id, Friend.friend_id), else_=Friend.user_id)
+
+def accepted_friend_ids(user_id):
+    """
+    Ids of the user's accepted friends. Looked up once per request and
+    kept on flask.g for any later caller in the same request.
+    """
+    cache = g.setdefault('accepted_friend_ids', {})
+    if user_id not in cache:
+        friends_query = read_session.query(friend_peer_id(user_id)).filter(
+            db.or_(
+                db.and_(Friend.user_id == user_id, Friend.status == 'accepted'),
+                db.and_(Friend.friend_id == user_id, Friend.status == 'accepted')
+            )
+        )
+        cache[user_id] = [row[0] for row in friends_query.all()]
+    return list(cache[user_id])
+
+def age_expression(date_of_birth, today):
+    """SQL expression for the age in whole years, on `today`, of a date of birth column."""
+    # Compare birthdays as MMDD integers, a later one hasn't happened yet this year
+    birth_month_day = db.extract('month', date_of_birth) * 100 + db.extract('day', date_of_birth)
+    birthday_pending = birth_month_day > today.month * 100 + today.day
+    return today.year - db.extract('year', date_of_birth) - db.case((birthday_pending, 1), else_=0)
+
+def parse_exercise_id(value):
+    """An exercise id sent as an int or a string of digits, as an int; None for anything else."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        return int(value)
+    return None
+
+def validate_workout_exercises(exercises):
+    """
+    Check the exercise entries of a workout payload, converting each
+    exercise_id to an int in place (clients may send "1"). Ids are checked
+    against the cached catalogue; only ids it doesn't know (added since it
+    was loaded, or invalid) are looked up with one IN query.
+    Returns an error response, or None if every entry is valid.
+    """
+    for exercise_data in exercises:
+        if 'exercise_id' not in exercise_data or 'sets' not in exercise_data or 'reps' not in exercise_data:
+            return jsonify({'error': 'Each exercise must have exercise_id, sets, and reps'}), 400
+        exercise_id = parse_exercise_id(exercise_data['exercise_id'])
+        if exercise_id is None:
+            return jsonify({'error': f'Invalid exercise_id: {exercise_data["exercise_id"]}'}), 400
+        exercise_data['exercise_id'] = exercise_id
+    
+    existing_ids = known_exercise_ids()
+    unknown_ids = {exercise_data['exercise_id'] for exercise_data in exercises} - existing_ids
+    if unknown_ids:
+        found_ids = {
+            row.exercise_id for row in
+            db.session.query(Exercise.exercise_id).filter(Exercise.exercise_id.in_(unknown_ids))
+        }
+        if found_ids - existing_ids:
+            # The catalogue grew in another process, reload it on next use
+            invalidate_exercise_cache()
+        existing_ids = existing_ids | found_ids
+    
+    for exercise_data in exercises:
+        if exercise_data['exercise_id'] not in existing_ids:
+            return jsonify({'error': f'Exercise with ID {exercise_data["exercise_id"]} not found'}), 404
+    
+    return None
+
+# Built once and reused so every request hits the engine's compiled-statement cache
+WORKOUT_EXERCISE_INSERT = WorkoutExercise.__table__.insert()
+
+def insert_workout_exercises(workout_id, exercises):
+    """Insert all exercises of a workout with one multi-row INSERT."""
+    if not exercises:
+        return
+    
+    db.session.execute(WORKOUT_EXERCISE_INSERT, [
+        {
+            'workout_id': workout_id,
+            'exercise_id': exercise_data['exercise_id'],
+            'sets': exercise_data['sets'],
+            'reps': exercise_data['reps'],
+            'weight': exercise_data.get('weight')
+        }
+        for exercise_data in exercises
+    ])
+
+# MMR needed to reach each tier after the first
+RANK_THRESHOLDS = (500, 1000)
+RANK_TIERS = ('Bronze', 'Silver', 'Gold')
+
+def tier_for(mmr):
+    """Rank tier for an MMR score."""
+    return RANK_TIERS[bisect.bisect_right(RANK_THRESHOLDS, mmr)]
+
+def tier_case(mmr):
+    """SQL expression for the rank tier of an MMR score expression, matching tier_for."""
+    tiers = zip(reversed(RANK_THRESHOLDS), reversed(RANK_TIERS))
+    return db.case(*((mmr >= threshold, tier) for threshold, tier in tiers), else_=RANK_TIERS[0])
+
+def schedule_ranking_update(user_id):
+    """Recompute the user's rankings on the background executor, off the request path."""
+    def run():
+        with app.app_context():
+            update_user_rankings(user_id)
+    background_executor.submit(run)
+
 def update_user_rankings(user_id):
     """
     Update user rankings based on workout performance.
     This is a simplified implementation - in a real app, you would use a more complex algorithm.
     """
     try:
-        # Get user's workouts
-        workouts = Workout.query.filter_by(user_id=user_id).all()
+        begin_immediate()
+        
+        # Calculate volume (sets * reps * weight) and the number of logged
+        # exercises for each muscle group across the user's workouts
+        stats_query = db.session.query(
+            Exercise.muscle_group,
+            db.func.sum(WorkoutExercise.sets * WorkoutExercise.reps * db.func.coalesce(WorkoutExercise.weight, 0)),
+            db.func.count(WorkoutExercise.workout_exercise_id)
+        ).select_from(WorkoutExercise).join(
+            Workout, Workout.workout_id == WorkoutExercise.workout_id
+        ).join(
+            Exercise, Exercise.exercise_id == WorkoutExercise.exercise_id
+        ).filter(
+            Workout.user_id == user_id
+        ).group_by(Exercise.muscle_group).order_by(db.func.min(WorkoutExercise.workout_exercise_id))
+        
+        muscle_group_stats = {
+            muscle_group: {'total_volume': total_volume, 'workout_count': workout_count}
+            for muscle_group, total_volume, workout_count in stats_query
+        }
         
-        if not workouts:
+        if not muscle_group_stats:
             return
         
-        # Calculate volume and performance for each muscle group
-        muscle_group_stats = {}
-        
-        for workout in workouts:
-            for workout_exercise in workout.exercises:
-                exercise = workout_exercise.exercise
-                muscle_group = exercise.muscle_group
-                
-                if muscle_group not in muscle_group_stats:
-                    muscle_group_stats[muscle_group] = {
-                        'total_volume': 0,
-                        'workout_count': 0
-                    }
-                
-                # Calculate volume (sets * reps * weight)
-                volume = workout_exercise.sets * workout_exercise.reps * (workout_exercise.weight or 0)
-                muscle_group_stats[muscle_group]['total_volume'] += volume
-                muscle_group_stats[muscle_group]['workout_count'] += 1
-        
         # Update rankings for each muscle group
+        rankings = []
+        firebase_rankings = {}
         for muscle_group, stats in muscle_group_stats.items():
             # Calculate MMR score based on volume and workout count
             # This is a simplified formula - in a real app, you would use a more complex algorithm
-            mmr_score = int(stats['total_volume'] * 0.1 + stats['workout_count'] * 10)
+            mmr = stats['total_volume'] * 0.1 + stats['workout_count'] * 10
+            mmr_score = int(mmr)
             
             # Determine rank tier based on MMR score
-            if mmr_score >= 1000:
-                rank_tier = 'Gold'
-            elif mmr_score >= 500:
-                rank_tier = 'Silver'
-            else:
-                rank_tier = 'Bronze'
-            
-            # Check if ranking exists
-            ranking = UserRanking.query.filter_by(user_id=user_id, muscle_group=muscle_group).first()
+            rank_tier = tier_for(mmr_score)
+            firebase_rankings[muscle_group] = {'mmr_score': mmr, 'rank_tier': rank_tier}
             
-            if ranking:
-                # Update existing ranking
-                ranking.mmr_score = mmr_score
-                ranking.rank_tier = rank_tier
-            else:
-                # Create new ranking
-                ranking = UserRanking(
-                    user_id=user_id,
-                    muscle_group=muscle_group,
-                    mmr_score=mmr_score,
-                    rank_tier=rank_tier
-                )
-                db.session.add(ranking)
+            rankings.append({
+                'user_id': user_id,
+                'muscle_group': muscle_group,
+                'mmr_score': mmr_score,
+                'rank_tier': rank_tier
+            })
+        
+        # Create or update all of them in one statement, leaving rows alone
+        # whose score and tier are both unchanged
+        ranking_upsert = upsert_statement(UserRanking).values(rankings)
+        db.session.execute(ranking_upsert.on_conflict_do_update(
+            index_elements=['user_id', 'muscle_group'],
+            set_={
+                'mmr_score': ranking_upsert.excluded.mmr_score,
+                'rank_tier': ranking_upsert.excluded.rank_tier,
+                'updated_at': ranking_upsert.excluded.updated_at
+            },
+            where=db.or_(
+                UserRanking.mmr_score.is_distinct_from(ranking_upsert.excluded.mmr_score),
+                UserRanking.rank_tier.is_distinct_from(ranking_upsert.excluded.rank_tier)
+            )
+        ))
+        
+        # Refresh the user's overall MMR used by the leaderboards
+        avg_mmr = db.session.query(db.func.avg(UserRanking.mmr_score)).filter_by(user_id=user_id).scalar()
+        overall_tier = tier_for(int(avg_mmr))
+        
+        overall_upsert = upsert_statement(UserOverallMMR).values(
+            user_id=user_id,
+            avg_mmr=avg_mmr,
+            rank_tier=overall_tier
+        )
+        db.session.execute(overall_upsert.on_conflict_do_update(
+            index_elements=['user_id'],
+            set_={
+                'avg_mmr': overall_upsert.excluded.avg_mmr,
+                'rank_tier': overall_upsert.excluded.rank_tier,
+                'updated_at': overall_upsert.excluded.updated_at
+            }
+        ))
         
         db.session.commit()
+        invalidate_leaderboard_cache()
         
         # Update Firebase for real-time leaderboard
         if firebase_enabled:
             firebase_db.child('rankings').child(str(user_id)).update({
                 'updated_at': datetime.datetime.utcnow().isoformat(),
-                'muscle_groups': {
-                    muscle_group: {
-                        'mmr_score': stats['total_volume'] * 0.1 + stats['workout_count'] * 10,
-                        'rank_tier': 'Gold' if stats['total_volume'] * 0.1 + stats['workout_count'] * 10 >= 1000 else 'Silver' if stats['total_volume'] * 0.1 + stats['workout_count'] * 10 >= 500 else 'Bronze'
-                    } for muscle_group, stats in muscle_group_stats.items()
-                }
+                'muscle_groups': firebase_rankings
             })
     
     except Exception as e:
         db.session.rollback()
         print(f"Error updating user rankings: {e}")
-# ────────────────────────────────────────────
-# New ranking & social endpoints (stubs)
-# ────────────────────────────────────────────
-@app.route('/api/rankings/user/<int:user_id>', methods=['GET'])
-@jwt_required()
-def get_user_rankings(user_id):
-    # TODO: wire up real ranking logic
-    mock_rankings = [
-        {"muscle_group": "chest", "rank": "Silver", "mmr": 750},
-        {"muscle_group": "back",  "rank": "Gold",   "mmr":1100},
-        {"muscle_group": "legs",  "rank": "Bronze", "mmr": 450}
-    ]
-    return jsonify(mock_rankings), 200
 
-@app.route('/api/social/shared-workouts', methods=['GET'])
-@jwt_required()
-def get_shared_workouts():
-    # TODO: return real shared workouts list
-    return jsonify([]), 200
+# Exercise catalogue seeded into an empty database, read only when seeding runs
+DEFAULT_EXERCISES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seeds', 'exercises.json')
 
-@app.route('/api/social/friends', methods=['GET'])
-@jwt_required()
-def get_friends():
-    status = request.args.get('status', 'accepted')
-    # TODO: filter by status
-    return jsonify([]), 200
+def load_default_exercises():
+    """Read the default exercise catalogue from the seed file."""
+    with open(DEFAULT_EXERCISES_PATH, 'rb') as f:
+        return orjson.loads(f.read())
+
+def seed_exercises():
+    """
+    Insert the default exercise catalogue if the exercises table is empty.
+    Runs in the caller's write transaction; returns True if rows were added.
+    """
+    # Check if exercises table is empty, one LIMIT 1 probe instead of a count
+    if db.session.query(Exercise.exercise_id).first() is not None:
+        return False
+    
+    # Add the default exercises
+    db.session.execute(
+        upsert_statement(Exercise).on_conflict_do_nothing(index_elements=['name']),
+        load_default_exercises()
+    )
+    return True
+
+# Bump whenever models, indexes or seed data change, so the next start
+# runs initialize_database in full again
+SCHEMA_VERSION = 1
+
+def schema_version(connection):
+    """The schema version recorded in the database, or None before the first initialization."""
+    if not db.inspect(connection).has_table('schema_meta'):
+        return None
+    return connection.execute(
+        db.select(SchemaMeta.version).filter_by(meta_id=1)
+    ).scalar()
+
+def stored_schema_version():
+    """schema_version() read outside any write lock, for the warm-start check."""
+    try:
+        return schema_version(db.session.connection())
+    finally:
+        # Hand the rw engine's single connection back to the pool
+        db.session.rollback()
 
 # Initialize database
 def initialize_database():
-    db.create_all()
-    
-    # Check if exercises table is empty
-    if Exercise.query.count() == 0:
-        # Add some default exercises
-        default_exercises = [
-            # Chest exercises
-            {'name': 'Bench Press', 'muscle_group': 'Chest', 'description': 'Lie on a flat bench and press weight upward.', 'is_compound': True},
-            {'name': 'Incline Bench Press', 'muscle_group': 'Chest', 'description': 'Lie on an inclined bench and press weight upward.', 'is_compound': True},
-            {'name': 'Decline Bench Press', 'muscle_group': 'Chest', 'description': 'Lie on a declined bench and press weight upward.', 'is_compound': True},
-            {'name': 'Dumbbell Fly', 'muscle_group': 'Chest', 'description': 'Lie on a bench and move dumbbells in an arc.', 'is_compound': False},
-            {'name': 'Push-Up', 'muscle_group': 'Chest', 'description': 'Push body up from the ground.', 'is_compound': True},
-            
-            # Back exercises
-            {'name': 'Pull-Up', 'muscle_group': 'Back', 'description': 'Pull body up to a bar.', 'is_compound': True},
-            {'name': 'Lat Pulldown', 'muscle_group': 'Back', 'description': 'Pull a bar down to chest level.', 'is_compound': True},
-            {'name': 'Bent Over Row', 'muscle_group': 'Back', 'description': 'Bend over and pull weight to chest.', 'is_compound': True},
-            {'name': 'Deadlift', 'muscle_group': 'Back', 'description': 'Lift weight from ground to hip level.', 'is_compound': True},
-            {'name': 'T-Bar Row', 'muscle_group': 'Back', 'description': 'Row weight upward using a T-bar.', 'is_compound': True},
-            
-            # Legs exercises
-            {'name': 'Squat', 'muscle_group': 'Legs', 'description': 'Bend knees and lower body, then stand up.', 'is_compound': True},
-            {'name': 'Leg Press', 'muscle_group': 'Legs', 'description': 'Push weight away using legs.', 'is_compound': True},
-            {'name': 'Leg Extension', 'muscle_group': 'Legs', 'description': 'Extend legs to lift weight.', 'is_compound': False},
-            {'name': 'Leg Curl', 'muscle_group': 'Legs', 'description': 'Curl legs to lift weight.', 'is_compound': False},
-            {'name': 'Calf Raise', 'muscle_group': 'Legs', 'description': 'Raise heels to lift weight.', 'is_compound': False},
-            
-            # Shoulders exercises
-            {'name': 'Overhead Press', 'muscle_group': 'Shoulders', 'description': 'Press weight overhead.', 'is_compound': True},
-            {'name': 'Lateral Raise', 'muscle_group': 'Shoulders', 'description': 'Raise arms to sides.', 'is_compound': False},
-            {'name': 'Front Raise', 'muscle_group': 'Shoulders', 'description': 'Raise arms to front.', 'is_compound': False},
-            {'name': 'Reverse Fly', 'muscle_group': 'Shoulders', 'description': 'Raise arms to back.', 'is_compound': False},
-            {'name': 'Shrug', 'muscle_group': 'Shoulders', 'description': 'Lift shoulders upward.', 'is_compound': False},
-            
-            # Arms exercises
-            {'name': 'Bicep Curl', 'muscle_group': 'Arms', 'description': 'Curl weight toward shoulder.', 'is_compound': False},
-            {'name': 'Tricep Extension', 'muscle_group': 'Arms', 'description': 'Extend arms to straighten.', 'is_compound': False},
-            {'name': 'Hammer Curl', 'muscle_group': 'Arms', 'description': 'Curl weight with neutral grip.', 'is_compound': False},
-            {'name': 'Skull Crusher', 'muscle_group': 'Arms', 'description': 'Lower weight to forehead, then extend arms.', 'is_compound': False},
-            {'name': 'Chin-Up', 'muscle_group': 'Arms', 'description': 'Pull body up to a bar with underhand grip.', 'is_compound': True}
-        ]
-        
-        for exercise_data in default_exercises:
-            exercise = Exercise(**exercise_data)
-            db.session.add(exercise)
-        
-        db.session.commit()
+    # Warm starts against an up-to-date database only read the version row
+    if stored_schema_version() == SCHEMA_VERSION:
+        return
+    
+    # The rest runs as one BEGIN IMMEDIATE transaction on the session's
+    # connection, DDL included. Workers starting together queue on the
+    # write lock, and those behind the first find the version current.
+    begin_immediate()
+    connection = db.session.connection()
+    if schema_version(connection) == SCHEMA_VERSION:
+        db.session.rollback()
+        return
+    
+    db.metadata.create_all(bind=connection)
+    
+    # create_all() skips existing tables, so add indexes declared after
+    # the table was first created
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+    
+    # Backfill overall MMR for rankings recorded before the table existed
+    if db.session.query(UserOverallMMR.user_id).first() is None:
+        avg_mmr = db.func.avg(UserRanking.mmr_score)
+        overall_mmr = db.cast(avg_mmr, db.Integer)
+        db.session.execute(UserOverallMMR.__table__.insert().from_select(
+            ['user_id', 'avg_mmr', 'rank_tier'],
+            db.select(
+                UserRanking.user_id,
+                avg_mmr,
+                tier_case(overall_mmr)
+            ).group_by(UserRanking.user_id)
+        ))
+    
+    # Create the exercise name search index on first start
+    if exercise_fts_enabled() and not db.inspect(connection).has_table('exercises_fts'):
+        for statement in EXERCISE_FTS_DDL:
+            db.session.execute(text(statement))
+    
+    seeded = seed_exercises()
+    
+    version_upsert = upsert_statement(SchemaMeta).values(meta_id=1, version=SCHEMA_VERSION)
+    db.session.execute(version_upsert.on_conflict_do_update(
+        index_elements=['meta_id'],
+        set_={'version': version_upsert.excluded.version}
+    ))
+    db.session.commit()
+    
+    if seeded:
+        invalidate_exercise_cache()
         print("Added default exercises to database")
 
-with app.app_context():
+@app.cli.command('init-db')
+def init_db_command():
+    """Create tables and indexes, and seed the exercise catalogue."""
     initialize_database()
+
+# Importing the app no longer touches the database; set SEED_ON_START=1 to
+# initialize it on import anyway (e.g. a first boot under gunicorn, where
+# every worker runs this and the write lock above serializes them)
+if os.environ.get('SEED_ON_START') == '1':
+    with app.app_context():
+        initialize_database()
+
 from flask import make_response, request
 
 # This runs after every request, ensuring CORS headers are present
@@ -1648,6 +2058,9 @@ def login_preflight():
     resp.headers["Access-Control-Allow-Methods"] = "POST,OPTIONS"
     return resp
 
-# Run the app
+# Run the app with the development server. Production runs under gunicorn
+# through wsgi.py; set FLASK_DEBUG=1 here for the reloader and debugger.
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    with app.app_context():
+        initialize_database()
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
@@ -1,10 +1,10 @@
 # create_db.py
 
-from app import app, db   # make sure your Flask app is in app.py and named 'app'
+from app import app, initialize_database   # make sure your Flask app is in app.py and named 'app'
    
 def create():
     with app.app_context():
-        db.create_all()
+        initialize_database()
         print('? evolvx.db and tables created!')
 
 if __name__ == '__main__':
@@ -0,0 +1,45 @@
+"""
+Request-parsing tests that don't need a database.
+Run from backend/: python -m unittest test_app
+"""
+import unittest
+
+from app import MAX_PER_PAGE, app, paginate_args, parse_exercise_id, validate_workout_exercises
+
+
+class ExerciseIdTests(unittest.TestCase):
+    def test_accepts_ints_and_digit_strings(self):
+        self.assertEqual(parse_exercise_id(1), 1)
+        self.assertEqual(parse_exercise_id('12'), 12)
+
+    def test_rejects_floats_bools_and_other_strings(self):
+        for value in (1.9, 1.0, True, False, '1.0', '-1', ' 1', '', 'x', None, [1]):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_exercise_id(value))
+
+    def test_float_and_bool_ids_are_a_bad_request(self):
+        for value in (1.9, True):
+            with self.subTest(value=value), app.test_request_context():
+                response, status = validate_workout_exercises([{'exercise_id': value, 'sets': 3, 'reps': 10}])
+                self.assertEqual(status, 400)
+                self.assertIn('Invalid exercise_id', response.get_json()['error'])
+
+
+class PaginateArgsTests(unittest.TestCase):
+    def paginate(self, query_string):
+        with app.test_request_context('/?' + query_string):
+            return paginate_args()
+
+    def test_defaults(self):
+        self.assertEqual(self.paginate(''), (1, 10))
+
+    def test_zero_and_negative_values_are_clamped_to_one(self):
+        self.assertEqual(self.paginate('page=0&per_page=0'), (1, 1))
+        self.assertEqual(self.paginate('page=-1&per_page=-5'), (1, 1))
+
+    def test_per_page_is_capped(self):
+        self.assertEqual(self.paginate('page=3&per_page=100000'), (3, MAX_PER_PAGE))
+
+
+if __name__ == '__main__':
+    unittest.main()
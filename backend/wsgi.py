@@ -0,0 +1,16 @@
+# wsgi.py
+#
+# Production entry point for Gunicorn with gevent workers:
+#
+#   gunicorn -k gevent -w 9 --worker-connections 1000 -b 0.0.0.0:8000 wsgi:app
+#
+# Use (2 x CPU cores + 1) workers. A greenlet waiting on Firebase's HTTP
+# socket yields to the others instead of stalling the worker. SQLite queries
+# still run inside the C driver without yielding, so keep them index-backed.
+
+from gevent import monkey
+
+# Must run before Flask, SQLAlchemy or firebase_admin import socket/threading
+monkey.patch_all()
+
+from app import app  # noqa: E402